@@ -28,15 +28,28 @@ from frappe.utils import (
 
 @frappe.whitelist()
 def approve_depreciation_entry():
-    je = frappe.db.get_all("Journal Entry" , filters={"voucher_type":"Depreciation Entry" , "workflow_state":"Draft"})
-    for j in je :
-        jj = frappe.get_doc("Journal Entry" , j.name)
-        jj.user_remark = jj.remark
-        jj.workflow_state = "Approved"
-        jj.save()
-        frappe.db.commit()
-        jj.workflow_state = "Submitted"
-        jj.save()
-        frappe.db.commit()
-        jj.submit()
-        frappe.db.commit()
+    je = frappe.get_all(
+        "Journal Entry",
+        filters={"voucher_type": "Depreciation Entry", "workflow_state": "Draft"},
+        pluck="name",
+    )
+    for name in je:
+        try:
+            jj = frappe.get_doc("Journal Entry", name)
+            jj.user_remark = jj.remark
+            # each state change is saved so the workflow transitions are validated
+            jj.workflow_state = "Approved"
+            jj.save()
+            jj.workflow_state = "Submitted"
+            jj.save()
+            jj.submit()
+            frappe.db.commit()
+        except Exception:
+            # keep going so one invalid entry doesn't block the rest of the drafts
+            frappe.db.rollback()
+            frappe.log_error(
+                title=f"Depreciation Entry {name} could not be approved",
+                reference_doctype="Journal Entry",
+                reference_name=name,
+            )
+            frappe.db.commit()
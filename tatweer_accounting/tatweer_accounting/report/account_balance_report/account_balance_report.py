@@ -15,9 +15,7 @@ from erpnext.accounts.report.financial_statements import (
     filter_accounts,
     filter_out_zero_value_rows,
     get_cost_centers_with_children,
-    set_gl_entries_by_account,
 )
-from erpnext.accounts.report.general_ledger.general_ledger import get_accounts_with_children
 from erpnext.accounts.report.utils import convert_to_presentation_currency, get_currency
 from erpnext.accounts.utils import get_zero_cutoff
 
@@ -30,9 +28,19 @@ value_fields = (
     "closing_credit",
 )
 
+# (column to keep, column to net against it) for opening and closing, by root type
+debit_net_columns = (("opening_debit", "opening_credit"), ("closing_debit", "closing_credit"))
+credit_net_columns = (("opening_credit", "opening_debit"), ("closing_credit", "closing_debit"))
+net_columns_by_root_type = {
+    "Asset": debit_net_columns,
+    "Equity": debit_net_columns,
+    "Expense": debit_net_columns,
+}
+
 
 def execute(filters=None):
     validate_filters(filters)
+    set_report_settings(filters)
     data = get_data(filters)
     columns = get_columns()
     return columns, data
@@ -55,13 +63,29 @@ def validate_filters(filters):
         frappe.throw(_("From Date cannot be greater than To Date"))
 
 
+def set_report_settings(filters):
+    """
+    Load settings and metadata used across the report into filters once per run,
+    so the individual queries don't fetch them again.
+    """
+    filters._ignore_is_opening = frappe.db.get_single_value(
+        "Accounts Settings", "ignore_is_opening_check_for_reporting"
+    )
+    filters._ignore_closing_balances = frappe.db.get_single_value(
+        "Accounts Settings", "ignore_account_closing_balance"
+    )
+    filters._accounting_dimensions = get_accounting_dimensions(as_list=False)
+    filters._has_finance_book = bool(frappe.db.count("Finance Book"))
+    filters._currency = get_currency(filters) if filters.get("presentation_currency") else None
+
+
 def get_data(filters):
     """
     Main data retrieval function for Account Balance Report.
 
     Data Flow:
     1. Filter accounts based on main_account (if provided) using nested set model
-    2. Get GL entries filtered by account hierarchy (root_lft, root_rgt)
+    2. Get GL totals per account filtered by account hierarchy (root_lft, root_rgt)
     3. Get opening balances filtered by account_filter
     4. Calculate values and accumulate into parent accounts
     5. Prepare data for tree display
@@ -101,69 +125,49 @@ def get_data(filters):
     root_rgt = None
 
     if filters.get("main_account"):
-        # Verify that the account exists and belongs to the company
-        account_exists = frappe.db.exists(
+        # Verify that the account exists and belongs to the company, and fetch its
+        # lft and rgt in the same round-trip
+        # These values select the account hierarchy below and are used in
+        # get_period_balances() to filter GL entries to leaf accounts within it
+        account_data = frappe.db.get_value(
             "Account",
-            {"name": filters.main_account, "company": filters.company}
+            {"name": filters.main_account, "company": filters.company},
+            ["name", "lft", "rgt"],
+            as_dict=True
         )
 
-        if not account_exists:
+        if not account_data:
             frappe.throw(_("Account {0} not found for company {1}").format(
                 filters.main_account, filters.company
             ))
 
+        root_lft = account_data.lft
+        root_rgt = account_data.rgt
+
         # Get all accounts under main_account (including main_account itself)
         # Uses nested set model: lft >= account.lft AND rgt <= account.rgt
-        account_filter = get_accounts_with_children(filters.main_account)
-
-        # If get_accounts_with_children returns None or empty, use the account itself
-        # This handles cases where the account exists but has no children
-        if not account_filter:
-            account_filter = [filters.main_account]
-
-        # Get lft and rgt of main_account for filtering GL Entries
-        # These values are used in get_account_filter_query() to filter GL entries
-        # via EXISTS subquery: EXISTS (SELECT name FROM tabAccount WHERE name = gl_entry.account
-        # AND lft >= root_lft AND rgt <= root_rgt AND is_group = 0)
-        account_data = frappe.db.get_value(
-            "Account",
-            filters.main_account,
-            ["lft", "rgt"],
-            as_dict=True
-        )
-        if account_data:
-            root_lft = account_data.lft
-            root_rgt = account_data.rgt
-        else:
-            # If we can't get lft/rgt, we can't filter GL entries properly
-            # But we should still show the account itself
-            frappe.log_error(
-                "[account_balance_report.py] method: get_data",
-                "Account Balance Report"
-            )
-
-    if account_filter:
-        # Use proper parameterized query with tuple for IN clause
-        # This ensures SQL injection protection and proper escaping
-        account_query += " AND name IN %s"
-        query_params.append(tuple(account_filter))
+        account_query += " AND lft >= %s AND rgt <= %s"
+        query_params.extend([root_lft, root_rgt])
 
     # Order by lft to maintain hierarchical structure (nested set model)
     account_query += " ORDER BY lft"
 
     accounts = frappe.db.sql(account_query, tuple(query_params), as_dict=True)
 
+    if filters.get("main_account"):
+        # Restrict opening balances to the accounts in the selected hierarchy
+        account_filter = [acc.name for acc in accounts]
+
     company_currency = filters.get("presentation_currency") or erpnext.get_company_currency(filters.company)
 
-    ignore_is_opening = frappe.db.get_single_value(
-        "Accounts Settings", "ignore_is_opening_check_for_reporting"
-    )
+    ignore_is_opening = filters._ignore_is_opening
 
     if not accounts:
         return None
 
     # Build hierarchical structure from flat account list
     # Returns: (filtered_accounts, accounts_by_name, parent_children_map)
+    # accounts_by_name is not needed, the roll-up uses positional parent indexes
     # If main_account is selected, we need to treat it as root for display
     # even if it has a parent_account in the full account tree
     if filters.get("main_account"):
@@ -176,33 +180,24 @@ def get_data(filters):
                 acc["parent_account"] = None
                 break
 
-    accounts, accounts_by_name, parent_children_map = filter_accounts(accounts)
+    accounts, _accounts_by_name, parent_children_map = filter_accounts(accounts)
 
-    gl_entries_by_account = {}
+    # Resolve each account's parent position and group flag once
+    set_account_indexes(accounts, parent_children_map)
+
+    # Resolve accounting dimension filters (including tree children) once per report
+    dimension_values = get_dimension_values(filters)
 
     # Get opening balances filtered by account_filter (if provided)
     # This ensures opening balances match the selected account hierarchy
-    opening_balances = get_opening_balances(filters, ignore_is_opening, account_filter)
+    opening_balances = get_opening_balances(
+        filters, ignore_is_opening, account_filter, dimension_values
+    )
 
-    # Ensure project filter is a list (required by financial_statements.py)
-    if filters.get("project"):
-        if not isinstance(filters.project, list):
-            filters.project = [filters.project]
-
-    # Fetch GL entries filtered by account hierarchy
-    # root_lft and root_rgt are used in get_account_filter_query() to create EXISTS subquery
-    # This ensures only GL entries for accounts within the selected hierarchy are included
-    set_gl_entries_by_account(
-        filters.company,
-        filters.from_date,
-        filters.to_date,
-        filters,
-        gl_entries_by_account,
-        root_lft=root_lft,
-        root_rgt=root_rgt,
-        ignore_closing_entries=not flt(filters.get("with_period_closing_entry_for_current_period", 1)),
-        ignore_opening_entries=True,
-        group_by_account=True,
+    # Fetch debit/credit totals per account for the period, filtered by account hierarchy
+    # root_lft and root_rgt restrict the totals to leaf accounts within the selected hierarchy
+    gl_entries_by_account = get_period_balances(
+        filters, root_lft, root_rgt, ignore_is_opening, dimension_values
     )
 
     # Calculate debit/credit values for each account from GL entries
@@ -211,42 +206,69 @@ def get_data(filters):
         gl_entries_by_account,
         opening_balances,
         filters.get("show_net_values"),
-        ignore_is_opening=ignore_is_opening,
     )
 
     # Roll up values from child accounts to parent accounts
     # This ensures parent accounts show aggregated balances of all children
-    accumulate_values_into_parents(accounts, accounts_by_name)
+    accumulate_values_into_parents(accounts)
 
     # Format data for tree display with proper indentation and structure
-    data = prepare_data(accounts, filters, parent_children_map, company_currency)
+    data = prepare_data(accounts, filters, company_currency)
 
     # If main_account is selected, ensure it and all its children are always shown
     # This is important for group accounts that may not have transactions
     if filters.get("main_account"):
         # Mark the main account and all its children to always show
         # This ensures they appear even if all values are zero
+        main_account = filters.get("main_account")
+        main_children_names = {
+            main_account,
+            *(child.name for child in parent_children_map.get(main_account, [])),
+        }
         for row in data:
-            if row.get("account") == filters.get("main_account"):
+            if row.get("account") in main_children_names:
                 row["has_value"] = True
-            # Also mark all children of main_account
-            elif parent_children_map.get(filters.get("main_account")):
-                for child in parent_children_map[filters.get("main_account")]:
-                    if row.get("account") == child.name:
-                        row["has_value"] = True
-                        break
 
     # Remove rows with zero values if show_zero_values is False
     # Note: filter_out_zero_value_rows will keep accounts with has_value=True
     # and also keep parent accounts if any child has has_value=True
-    data = filter_out_zero_value_rows(
-        data, parent_children_map, show_zero_values=filters.get("show_zero_values")
-    )
+    if not filters.get("show_zero_values"):
+        data = filter_out_zero_value_rows(data, parent_children_map, show_zero_values=False)
 
     return data
 
 
-def get_opening_balances(filters, ignore_is_opening, account_filter=None):
+def get_dimension_values(filters):
+    """
+    Resolve accounting dimension filters into the values to filter GL data by.
+
+    The result is applied through apply_accounting_filters() to both the opening
+    balance and period balance queries. Tree dimensions are expanded to include their
+    children, and the resolved values are also written back into filters.
+
+    Args:
+        filters: Report filters dictionary
+
+    Returns:
+        Dictionary of dimension values: {dimension_fieldname: [values], ...}
+    """
+    dimension_values = {}
+
+    for dimension in filters._accounting_dimensions:
+        if not filters.get(dimension.fieldname):
+            continue
+
+        if frappe.get_cached_value("DocType", dimension.document_type, "is_tree"):
+            filters[dimension.fieldname] = get_dimension_with_children(
+                dimension.document_type, filters.get(dimension.fieldname)
+            )
+
+        dimension_values[dimension.fieldname] = filters[dimension.fieldname]
+
+    return dimension_values
+
+
+def get_opening_balances(filters, ignore_is_opening, account_filter=None, dimension_values=None):
     """
     Get opening balances for both Balance Sheet and Profit & Loss accounts.
 
@@ -254,30 +276,29 @@ def get_opening_balances(filters, ignore_is_opening, account_filter=None):
         filters: Report filters dictionary
         ignore_is_opening: Whether to ignore is_opening flag
         account_filter: Optional list of account names to filter by
+        dimension_values: Resolved accounting dimension filters from get_dimension_values()
 
     Returns:
         Dictionary of opening balances: {account_name: {opening_debit, opening_credit}, ...}
     """
-    balance_sheet_opening = get_rootwise_opening_balances(
-        filters, "Balance Sheet", ignore_is_opening, account_filter
-    )
-    pl_opening = get_rootwise_opening_balances(
-        filters, "Profit and Loss", ignore_is_opening, account_filter
+    # Both report types are fetched in the same query per source doctype
+    return get_rootwise_opening_balances(
+        filters,
+        ("Balance Sheet", "Profit and Loss"),
+        ignore_is_opening,
+        account_filter,
+        dimension_values,
     )
 
-    balance_sheet_opening.update(pl_opening)
-    return balance_sheet_opening
 
-
-def get_rootwise_opening_balances(filters, report_type, ignore_is_opening, account_filter=None):
+def get_rootwise_opening_balances(
+        filters, report_types, ignore_is_opening, account_filter=None, dimension_values=None
+):
     gle = []
 
     last_period_closing_voucher = ""
-    ignore_closing_balances = frappe.db.get_single_value(
-        "Accounts Settings", "ignore_account_closing_balance"
-    )
 
-    if not ignore_closing_balances:
+    if not filters._ignore_closing_balances:
         last_period_closing_voucher = frappe.db.get_all(
             "Period Closing Voucher",
             filters={"docstatus": 1, "company": filters.company, "period_end_date": ("<", filters.from_date)},
@@ -286,14 +307,12 @@ def get_rootwise_opening_balances(filters, report_type, ignore_is_opening, accou
             limit=1,
         )
 
-    accounting_dimensions = get_accounting_dimensions(as_list=False)
-
     if last_period_closing_voucher:
         gle = get_opening_balance(
             "Account Closing Balance",
             filters,
-            report_type,
-            accounting_dimensions,
+            report_types,
+            dimension_values,
             period_closing_voucher=last_period_closing_voucher[0].name,
             ignore_is_opening=ignore_is_opening,
             account_filter=account_filter,
@@ -305,8 +324,8 @@ def get_rootwise_opening_balances(filters, report_type, ignore_is_opening, accou
             gle += get_opening_balance(
                 "GL Entry",
                 filters,
-                report_type,
-                accounting_dimensions,
+                report_types,
+                dimension_values,
                 start_date=start_date,
                 ignore_is_opening=ignore_is_opening,
                 account_filter=account_filter,
@@ -315,24 +334,26 @@ def get_rootwise_opening_balances(filters, report_type, ignore_is_opening, accou
         gle = get_opening_balance(
             "GL Entry",
             filters,
-            report_type,
-            accounting_dimensions,
+            report_types,
+            dimension_values,
             ignore_is_opening=ignore_is_opening,
             account_filter=account_filter,
         )
 
-    opening = frappe._dict()
+    # Rows are already grouped by account, so an account only repeats when
+    # closing balances and GL Entries are combined for a mid-year start
+    opening = {}
     for d in gle:
-        opening.setdefault(
-            d.account,
-            {
+        e = opening.get(d.account)
+        if e is None:
+            opening[d.account] = {
                 "account": d.account,
-                "opening_debit": 0.0,
-                "opening_credit": 0.0,
-            },
-        )
-        opening[d.account]["opening_debit"] += flt(d.debit)
-        opening[d.account]["opening_credit"] += flt(d.credit)
+                "opening_debit": d.debit or 0.0,
+                "opening_credit": d.credit or 0.0,
+            }
+        else:
+            e["opening_debit"] += d.debit or 0.0
+            e["opening_credit"] += d.credit or 0.0
 
     return opening
 
@@ -340,28 +361,37 @@ def get_rootwise_opening_balances(filters, report_type, ignore_is_opening, accou
 def get_opening_balance(
         doctype,
         filters,
-        report_type,
-        accounting_dimensions,
+        report_types,
+        dimension_values,
         period_closing_voucher=None,
         start_date=None,
         ignore_is_opening=0,
         account_filter=None,
 ):
     closing_balance = frappe.qb.DocType(doctype)
-    accounts = frappe.db.get_all("Account", filters={"report_type": report_type}, pluck="name")
+    account = frappe.qb.DocType("Account")
 
+    # Join Account to filter by report type and to know each row's report type
+    # for the presentation currency conversion
     opening_balance = (
         frappe.qb.from_(closing_balance)
+        .inner_join(account)
+        .on(account.name == closing_balance.account)
         .select(
             closing_balance.account,
             closing_balance.account_currency,
+            account.report_type,
             Sum(closing_balance.debit).as_("debit"),
             Sum(closing_balance.credit).as_("credit"),
             Sum(closing_balance.debit_in_account_currency).as_("debit_in_account_currency"),
             Sum(closing_balance.credit_in_account_currency).as_("credit_in_account_currency"),
         )
-        .where((closing_balance.company == filters.company) & (closing_balance.account.isin(accounts)))
-        .groupby(closing_balance.account)
+        .where(
+            (closing_balance.company == filters.company)
+            & (account.report_type.isin(report_types))
+            & (account.company == filters.company)
+        )
+        .groupby(closing_balance.account, account.report_type)
     )
 
     # Apply account filter if provided
@@ -393,22 +423,132 @@ def get_opening_balance(
     if doctype == "GL Entry":
         opening_balance = opening_balance.where(closing_balance.is_cancelled == 0)
 
+        # Pin the plan to the posting date index; on large ledgers MariaDB may otherwise
+        # pick a less selective index and scan most of the table
+        if frappe.db.db_type == "mariadb":
+            opening_balance = opening_balance.force_index("posting_date_company_index")
+
     if not flt(filters.get("with_period_closing_entry_for_opening", 1)):
         if doctype == "Account Closing Balance":
             opening_balance = opening_balance.where(closing_balance.is_period_closing_voucher_entry == 0)
         else:
             opening_balance = opening_balance.where(closing_balance.voucher_type != "Period Closing Voucher")
 
+    opening_balance = apply_accounting_filters(
+        opening_balance, closing_balance, filters, dimension_values
+    )
+
+    gle = opening_balance.run(as_dict=1)
+
+    if filters._currency:
+        convert_opening_to_presentation_currency(gle, filters._currency)
+
+    return gle
+
+
+def convert_opening_to_presentation_currency(gle, currency):
+    """
+    Convert opening balance rows to the presentation currency, one report type at a time.
+
+    convert_to_presentation_currency() decides for the whole list whether the account
+    currency amounts can be used, so Balance Sheet and Profit and Loss rows are passed
+    separately to keep the same result as querying each report type on its own.
+    """
+    for report_type in {d.report_type for d in gle}:
+        convert_to_presentation_currency(
+            [d for d in gle if d.report_type == report_type], currency
+        )
+
+
+def get_period_balances(
+        filters, root_lft=None, root_rgt=None, ignore_is_opening=0, dimension_values=None
+):
+    """
+    Get debit/credit totals per account for GL Entries within the report period.
+
+    Entries are aggregated in SQL so memory scales with the number of accounts rather
+    than the number of GL Entries. Opening entries are excluded in the query unless
+    ignore_is_opening is set.
+
+    Args:
+        filters: Report filters dictionary
+        root_lft: Optional lft of the selected main account
+        root_rgt: Optional rgt of the selected main account
+        ignore_is_opening: Whether to ignore is_opening flag
+        dimension_values: Resolved accounting dimension filters from get_dimension_values()
+
+    Returns:
+        Dictionary of GL totals: {account_name: {debit, credit, ...}, ...}
+    """
+    gl_entry = frappe.qb.DocType("GL Entry")
+
+    query = (
+        frappe.qb.from_(gl_entry)
+        .select(
+            gl_entry.account,
+            gl_entry.account_currency,
+            Sum(gl_entry.debit).as_("debit"),
+            Sum(gl_entry.credit).as_("credit"),
+            Sum(gl_entry.debit_in_account_currency).as_("debit_in_account_currency"),
+            Sum(gl_entry.credit_in_account_currency).as_("credit_in_account_currency"),
+        )
+        .where(
+            (gl_entry.company == filters.company)
+            & (gl_entry.posting_date >= filters.from_date)
+            & (gl_entry.posting_date <= filters.to_date)
+            & (gl_entry.is_cancelled == 0)
+        )
+        .groupby(gl_entry.account)
+    )
+
+    if root_lft and root_rgt:
+        account = frappe.qb.DocType("Account")
+        query = query.where(
+            gl_entry.account.isin(
+                frappe.qb.from_(account)
+                .select("name")
+                .where(
+                    (account.company == filters.company)
+                    & (account.is_group == 0)
+                    & (account.lft >= root_lft)
+                    & (account.rgt <= root_rgt)
+                )
+            )
+        )
+
+    if not ignore_is_opening:
+        query = query.where(gl_entry.is_opening == "No")
+
+    if not flt(filters.get("with_period_closing_entry_for_current_period", 1)):
+        query = query.where(gl_entry.voucher_type != "Period Closing Voucher")
+
+    query = apply_accounting_filters(query, gl_entry, filters, dimension_values)
+
+    gle = query.run(as_dict=1)
+
+    if filters._currency:
+        convert_to_presentation_currency(gle, filters._currency)
+
+    return {entry.account: entry for entry in gle}
+
+
+def apply_accounting_filters(query, gl_entry, filters, dimension_values=None):
+    """
+    Apply cost center, project, finance book and accounting dimension filters.
+
+    Shared by the opening balance and period balance queries so both sides of the
+    report are filtered the same way.
+    """
     if filters.get("cost_center"):
-        opening_balance = opening_balance.where(
-            closing_balance.cost_center.isin(get_cost_centers_with_children(filters.get("cost_center")))
+        query = query.where(
+            gl_entry.cost_center.isin(get_cost_centers_with_children(filters.get("cost_center")))
         )
 
     if filters.get("project"):
         project_list = filters.project if isinstance(filters.project, list) else [filters.project]
-        opening_balance = opening_balance.where(closing_balance.project.isin(project_list))
+        query = query.where(gl_entry.project.isin(project_list))
 
-    if frappe.db.count("Finance Book"):
+    if filters._has_finance_book:
         if filters.get("include_default_book_entries"):
             company_fb = frappe.get_cached_value("Company", filters.company, "default_finance_book")
 
@@ -417,60 +557,39 @@ def get_opening_balance(
                     _("To use a different finance book, please uncheck 'Include Default FB Entries'")
                 )
 
-            opening_balance = opening_balance.where(
-                (closing_balance.finance_book.isin([cstr(filters.get("finance_book", "")), cstr(company_fb), ""]))
-                | (closing_balance.finance_book.isnull())
+            query = query.where(
+                (gl_entry.finance_book.isin([cstr(filters.get("finance_book", "")), cstr(company_fb), ""]))
+                | (gl_entry.finance_book.isnull())
             )
         else:
-            opening_balance = opening_balance.where(
-                (closing_balance.finance_book.isin([cstr(filters.get("finance_book", "")), ""]))
-                | (closing_balance.finance_book.isnull())
+            query = query.where(
+                (gl_entry.finance_book.isin([cstr(filters.get("finance_book", "")), ""]))
+                | (gl_entry.finance_book.isnull())
             )
 
-    if accounting_dimensions:
-        for dimension in accounting_dimensions:
-            if filters.get(dimension.fieldname):
-                if frappe.get_cached_value("DocType", dimension.document_type, "is_tree"):
-                    filters[dimension.fieldname] = get_dimension_with_children(
-                        dimension.document_type, filters.get(dimension.fieldname)
-                    )
-                    opening_balance = opening_balance.where(
-                        closing_balance[dimension.fieldname].isin(filters[dimension.fieldname])
-                    )
-                else:
-                    opening_balance = opening_balance.where(
-                        closing_balance[dimension.fieldname].isin(filters[dimension.fieldname])
-                    )
-
-    gle = opening_balance.run(as_dict=1)
-
-    if filters and filters.get("presentation_currency"):
-        convert_to_presentation_currency(gle, get_currency(filters))
+    if dimension_values:
+        for fieldname, values in dimension_values.items():
+            query = query.where(gl_entry[fieldname].isin(values))
 
-    return gle
+    return query
 
 
-def calculate_values(accounts, gl_entries_by_account, opening_balances, show_net_values, ignore_is_opening=0):
-    init = {
-        "opening_debit": 0.0,
-        "opening_credit": 0.0,
-        "debit": 0.0,
-        "credit": 0.0,
-        "closing_debit": 0.0,
-        "closing_credit": 0.0,
-    }
-
+def calculate_values(accounts, gl_entries_by_account, opening_balances, show_net_values):
     for d in accounts:
-        d.update(init.copy())
-
         # add opening
-        d["opening_debit"] = opening_balances.get(d.name, {}).get("opening_debit", 0)
-        d["opening_credit"] = opening_balances.get(d.name, {}).get("opening_credit", 0)
+        opening = opening_balances.get(d.name)
+        if opening:
+            d["opening_debit"] = opening["opening_debit"]
+            d["opening_credit"] = opening["opening_credit"]
+        else:
+            d["opening_debit"] = d["opening_credit"] = 0.0
 
-        for entry in gl_entries_by_account.get(d.name, []):
-            if cstr(entry.is_opening) != "Yes" or ignore_is_opening:
-                d["debit"] += flt(entry.debit)
-                d["credit"] += flt(entry.credit)
+        entry = gl_entries_by_account.get(d.name)
+        if entry:
+            d["debit"] = entry.debit or 0.0
+            d["credit"] = entry.credit or 0.0
+        else:
+            d["debit"] = d["credit"] = 0.0
 
         d["closing_debit"] = d["opening_debit"] + d["debit"]
         d["closing_credit"] = d["opening_credit"] + d["credit"]
@@ -497,26 +616,40 @@ def calculate_total_row(accounts, company_currency):
     }
 
     for d in accounts:
-        if not d.parent_account:
+        if d._parent_idx < 0:
             for field in value_fields:
                 total_row[field] += d[field]
 
     return total_row
 
 
-def accumulate_values_into_parents(accounts, accounts_by_name):
+def set_account_indexes(accounts, parent_children_map):
+    """Store each account's parent position in accounts (-1 for roots) and its group flag."""
+    index_by_name = {d.name: i for i, d in enumerate(accounts)}
+
+    for d in accounts:
+        d["_parent_idx"] = index_by_name.get(d.parent_account, -1)
+        d["_is_group"] = d.name in parent_children_map
+
+
+def accumulate_values_into_parents(accounts):
+    # accounts are in tree order (a parent always precedes its children), so a
+    # single reverse walk rolls every subtree up before its parent is visited
     for d in reversed(accounts):
-        if d.parent_account:
+        if d._parent_idx >= 0:
+            parent = accounts[d._parent_idx]
             for key in value_fields:
-                accounts_by_name[d.parent_account][key] += d[key]
+                parent[key] += d[key]
 
 
-def prepare_data(accounts, filters, parent_children_map, company_currency):
+def prepare_data(accounts, filters, company_currency):
     data = []
+    zero_cutoff = get_zero_cutoff(company_currency)
+    show_net_values = filters.get("show_net_values")
 
     for d in accounts:
         # Prepare opening closing for group account
-        if parent_children_map.get(d.account) and filters.get("show_net_values"):
+        if show_net_values and d._is_group:
             prepare_opening_closing(d)
 
         has_value = False
@@ -533,9 +666,9 @@ def prepare_data(accounts, filters, parent_children_map, company_currency):
         }
 
         for key in value_fields:
-            row[key] = flt(d.get(key, 0.0))
+            row[key] = d.get(key) or 0.0
 
-            if abs(row[key]) >= get_zero_cutoff(company_currency):
+            if abs(row[key]) >= zero_cutoff:
                 # ignore zero values
                 has_value = True
 
@@ -604,12 +737,7 @@ def get_columns():
 
 
 def prepare_opening_closing(row):
-    dr_or_cr = "debit" if row["root_type"] in ["Asset", "Equity", "Expense"] else "credit"
-    reverse_dr_or_cr = "credit" if dr_or_cr == "debit" else "debit"
-
-    for col_type in ["opening", "closing"]:
-        valid_col = col_type + "_" + dr_or_cr
-        reverse_col = col_type + "_" + reverse_dr_or_cr
+    for valid_col, reverse_col in net_columns_by_root_type.get(row["root_type"], credit_net_columns):
         row[valid_col] -= row[reverse_col]
         if row[valid_col] < 0:
             row[reverse_col] = abs(row[valid_col])
@@ -148,9 +148,8 @@ def get_data(filters):
 	accumulate_values_into_parents(accounts, accounts_by_name)
 
 	data = prepare_data(accounts, filters, parent_children_map, company_currency)
-	data = filter_out_zero_value_rows(
-		data, parent_children_map, show_zero_values=filters.get("show_zero_values")
-	)
+	if not filters.get("show_zero_values"):
+		data = filter_out_zero_value_rows(data, parent_children_map, show_zero_values=False)
 	# keep only:
 	# - top-level accounts (no parent or indent 0)
 	# - the separator row ({})